@@ -729,3 +729,42 @@ class TestBase:
 
         with pytest.raises(ValueError, match='is not a finite'):
             o.latitude = float('-inf')
+
+    def test_fast_init(self):
+        """
+        Tests that _fast_init creates the same objects as the usual
+        initialization.
+        """
+        t = UTCDateTime(2025, 5, 14)
+        wid = WaveformStreamID._fast_init(network_code='GR',
+                                          station_code='FUR',
+                                          channel_code='HHZ')
+        assert wid == WaveformStreamID('GR', 'FUR', channel_code='HHZ')
+        comment = Comment(text='x')
+        pick = Pick._fast_init(waveform_id=wid, phase_hint='P', time=t,
+                               backazimuth='10', comments=[comment])
+        assert pick.resource_id.get_referred_object() is pick
+        pick2 = Pick(waveform_id=wid, phase_hint='P', time=t,
+                     backazimuth='10', comments=[comment],
+                     resource_id=pick.resource_id)
+        assert pick.__dict__.keys() == pick2.__dict__.keys()
+        assert pick == pick2
+        assert pick.backazimuth == 10.0
+        assert isinstance(pick.time_errors, QuantityError)
+        assert pick.time_errors is not Pick._fast_init().time_errors
+        # dicts are converted to the attribute type
+        origin = Origin._fast_init(latitude_errors={'uncertainty': 0.1})
+        assert isinstance(origin.latitude_errors, QuantityError)
+        assert origin.latitude_errors.uncertainty == 0.1
+        # only the own resource id is bound to the new object
+        pick = Pick._fast_init()
+        origin = Origin._fast_init(method_id=pick.resource_id)
+        assert origin.method_id.get_referred_object() is pick
+        assert origin.resource_id.get_referred_object() is origin
+        assert Pick._fast_init(force_resource_id=False).resource_id is None
+        with pytest.raises(ValueError, match='is not a finite'):
+            Origin._fast_init(latitude=float('nan'))
+        with pytest.raises(ValueError, match='could not be converted'):
+            Pick._fast_init(onset='not an onset')
+        with pytest.raises(TypeError, match='no property or container'):
+            Pick._fast_init(some_typo=1)
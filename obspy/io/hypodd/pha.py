@@ -8,9 +8,11 @@ HypoDD PHA read support.
     GNU Lesser General Public License, Version 3
     (https://www.gnu.org/copyleft/lesser.html)
 """
-import io
-from math import cos
-from numpy import deg2rad
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from math import cos, radians
+import mmap
+import numpy as np
 from warnings import warn
 
 from obspy import UTCDateTime
@@ -22,42 +24,136 @@ from obspy.core.inventory.util import (
 
 
 DEG2KM = 111.2
+# smaller files are always read in a single process
+_PARALLEL_MIN_EVENTS = 10000
+# arguments shared by all events, set in each worker process
+_worker_args = None
 
 
-def _block2event(block, eventid_map, **kwargs):
+def _iter_blocks(buf):
+    """
+    Yield event blocks of a PHA file buffer as bytes
+
+    Blocks start after each '#', which does not need to be at the beginning
+    of a line. Data before the first header and empty blocks are ignored.
+    """
+    start = buf.find(b'#')
+    while start != -1:
+        end = buf.find(b'#', start + 1)
+        block = buf[start + 1:] if end == -1 else buf[start + 1:end]
+        if block.strip():
+            yield block
+        start = end
+
+
+def _read_blocks(filename, encoding='utf-8'):
+    """
+    Yield the decoded event blocks of a PHA file one at a time
+    """
+    if '#\n'.encode(encoding) != b'#\n':
+        # blocks are scanned on the bytes level, which needs an ASCII
+        # compatible encoding, otherwise decode the whole file up front
+        with open(filename, 'r', encoding=encoding) as f:
+            buf = f.read().encode('utf-8')
+        for block in _iter_blocks(buf):
+            yield block.decode('utf-8')
+        return
+    with open(filename, 'rb') as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return
+    with buf:
+        for block in _iter_blocks(buf):
+            yield block.decode(encoding)
+
+
+def _block2columns(block):
+    """
+    Read header tokens and pick columns of a decoded event block
+
+    Returns the header tokens and the station, relative time (in
+    nanoseconds), weight and phase columns of the picks. The pick lines are
+    tokenized with a single split and the numeric columns are converted in
+    one go.
+    """
+    lines = block.splitlines()
+    header = lines[0]
+    if len(header.split()) != 14:
+        msg = ('Header line of event block "%s" does not consist of 14 '
+               'columns' % header.strip())
+        raise ValueError(msg)
+    # pick lines consist of four tokens each
+    tokens = ' '.join(lines[1:]).split()
+    nlines = sum(1 for line in lines[1:] if line.strip())
+    if len(tokens) != 4 * nlines:
+        msg = ('Pick lines of event block "%s" do not consist of four '
+               'columns' % header.strip())
+        raise ValueError(msg)
+    try:
+        reltimes = np.array(tokens[1::4], dtype=np.float64)
+        weights = np.array(tokens[2::4], dtype=np.float64)
+    except ValueError as ex:
+        msg = 'Invalid pick line in event block "%s": %s'
+        raise ValueError(msg % (header.strip(), ex))
+    # relative times in integer nanoseconds to keep full precision
+    reltimes = np.round(reltimes * 1e9)
+    if not np.all(np.abs(reltimes) < 2 ** 63):  # also catches nan
+        msg = ('Invalid relative pick time in event block "%s", it is not '
+               'finite or too large' % header.strip())
+        raise ValueError(msg)
+    rel_ns = reltimes.astype(np.int64)
+    return header.split(), tokens[0::4], rel_ns, weights, tokens[3::4]
+
+
+def _block2event(block, eventid_map, seedid_cache=None, **kwargs):
     """
     Read HypoDD event block
+
+    Resolved SEED ids are stored in seedid_cache, keyed by station and phase.
     """
-    lines = block.strip().splitlines()
-    yr, mo, dy, hr, mn, sc, la, lo, dp, mg, eh, ez, rms, id_ = lines[0].split()
+    header, stas, rel_ns, weights, phases = _block2columns(block)
+    weights = weights.tolist()
+    yr, mo, dy, hr, mn, sc, la, lo, dp, mg, eh, ez, rms, id_ = header
     if eventid_map is not None and id_ in eventid_map:
         id_ = eventid_map[id_]
     time = UTCDateTime(int(yr), int(mo), int(dy), int(hr), int(mn), float(sc),
                        strict=False)
-    laterr = None if float(eh) == 0 else float(eh) / DEG2KM
-    lonerr = (None if laterr is None or float(la) > 89 else
-              laterr / cos(deg2rad(float(la))))
-    ez = None if float(ez) == 0 else float(ez) * 1000
-    rms = None if float(rms) == 0 else float(rms)
+    la, lo, dp = float(la), float(lo), float(dp)
+    eh, ez, rms = float(eh), float(ez), float(rms)
+    laterr = None if eh == 0 else eh / DEG2KM
+    lonerr = None if laterr is None or la > 89 else laterr / cos(radians(la))
+    ez = None if ez == 0 else ez * 1000
+    rms = None if rms == 0 else rms
+    time_ns = time.ns
+    pick_ns = [time_ns + ns for ns in rel_ns.tolist()]
+    if seedid_cache is None or kwargs.get('inventory') is not None:
+        # inventory look ups depend on the origin time, cache per event only
+        seedid_cache = {}
     picks = []
-    arrivals = []
-    for line in lines[1:]:
-        sta, reltime, weight, phase = line.split()
-        widargs = _resolve_seedid(sta, '', time=time, phase=phase, **kwargs)
-        wid = WaveformStreamID(*widargs)
-        pick = Pick(waveform_id=wid, phase_hint=phase,
-                    time=time + float(reltime))
-        arrival = Arrival(phase=phase, pick_id=pick.resource_id,
-                          time_weight=float(weight))
-        picks.append(pick)
-        arrivals.append(arrival)
+    for sta, ns, phase in zip(stas, pick_ns, phases):
+        try:
+            widargs = seedid_cache[sta, phase]
+        except KeyError:
+            widargs = _resolve_seedid(sta, '', time=time, phase=phase,
+                                      **kwargs)
+            seedid_cache[sta, phase] = widargs
+        net, sta, loc, cha = widargs
+        wid = WaveformStreamID._fast_init(
+            network_code=net, station_code=sta, location_code=loc,
+            channel_code=cha)
+        picks.append(Pick._fast_init(waveform_id=wid, phase_hint=phase,
+                                     time=UTCDateTime(ns=ns)))
+    arrivals = [Arrival._fast_init(phase=phase, pick_id=pick.resource_id,
+                                   time_weight=weight)
+                for pick, weight, phase in zip(picks, weights, phases)]
     qu = OriginQuality(associated_phase_count=len(picks), standard_error=rms)
     origin = Origin(arrivals=arrivals,
                     resource_id="smi:local/origin/" + id_,
                     quality=qu,
-                    latitude=float(la),
-                    longitude=float(lo),
-                    depth=1000 * float(dp),
+                    latitude=la,
+                    longitude=lo,
+                    depth=1000 * dp,
                     latitude_errors=laterr,
                     longitude_errors=lonerr,
                     depth_errors=ez,
@@ -78,6 +174,22 @@ def _block2event(block, eventid_map, **kwargs):
     return event
 
 
+def _init_worker(eventid_map, kwargs):
+    """
+    Store the arguments shared by all events in a worker process
+    """
+    global _worker_args
+    _worker_args = (eventid_map, {}, kwargs)
+
+
+def _worker_block2event(block):
+    """
+    Read HypoDD event block in a worker process, see _init_worker
+    """
+    eventid_map, seedid_cache, kwargs = _worker_args
+    return _block2event(block, eventid_map, seedid_cache, **kwargs)
+
+
 def _is_pha(filename):
     try:
         with open(filename, 'rb') as f:
@@ -93,9 +205,77 @@ def _is_pha(filename):
         return True
 
 
+def _read_pha_arrays(filename, eventid_map=None, encoding='utf-8'):
+    """
+    Read a HypoDD PHA file into numpy arrays.
+
+    No event objects are created. Instead, a dictionary with one array per
+    header field and one array per pick column is returned. The
+    ``event_index`` array maps picks to events.
+
+    :param str filename: File name.
+    :param dict eventid_map: Desired mapping of hypodd event ids (dict values)
+        to event ids (dict keys). By default, ids are not mapped.
+    :param str encoding: encoding used (default: utf-8)
+
+    :rtype: dict
+    :return: Dictionary with the event arrays ``event_ids``,
+        ``origin_times`` (POSIX timestamps), ``latitudes``, ``longitudes``,
+        ``depths`` (km), ``magnitudes``, ``horizontal_errors`` (km),
+        ``vertical_errors`` (km) and ``rms`` (s), and the pick arrays
+        ``event_index``, ``stations``, ``pick_times`` (POSIX timestamps),
+        ``weights`` and ``phases``.
+    """
+    headers = []
+    counts = []
+    stas = []
+    rel_ns = []
+    weights = []
+    phases = []
+    for block in _read_blocks(filename, encoding=encoding):
+        columns = _block2columns(block)
+        headers.append(columns[0])
+        counts.append(len(columns[1]))
+        stas.extend(columns[1])
+        rel_ns.append(columns[2])
+        weights.append(columns[3])
+        phases.extend(columns[4])
+    rel_ns = np.concatenate(rel_ns) if rel_ns else np.empty(0, np.int64)
+    weights = np.concatenate(weights) if weights else np.empty(0)
+    header = np.array(headers, dtype=str).reshape(-1, 14)
+    ids = header[:, 13]
+    if eventid_map is not None:
+        eventid_map = {v: k for k, v in eventid_map.items()}
+        ids = np.array([eventid_map.get(id_, id_) for id_ in ids], dtype=str)
+    yr, mo, dy, hr, mn = header[:, :5].astype(np.int64).T
+    days = ((yr - 1970).astype('datetime64[Y]') +
+            (mo - 1).astype('timedelta64[M]')).astype('datetime64[D]')
+    days = (days + (dy - 1).astype('timedelta64[D]')).astype(np.int64)
+    origin_times = (86400 * days + 3600 * hr + 60 * mn +
+                    header[:, 5].astype(np.float64))
+    (lat, lon, dep, mag, herr, verr,
+     rms) = header[:, 6:13].astype(np.float64).T
+    event_index = np.repeat(np.arange(len(headers)), counts)
+    return {'event_ids': ids,
+            'origin_times': origin_times,
+            'latitudes': lat,
+            'longitudes': lon,
+            'depths': dep,
+            'magnitudes': mag,
+            'horizontal_errors': herr,
+            'vertical_errors': verr,
+            'rms': rms,
+            'event_index': event_index,
+            'stations': np.array(stas, dtype=str),
+            'pick_times': origin_times[event_index] + rel_ns * 1e-9,
+            'weights': weights,
+            'phases': np.array(phases, dtype=str)}
+
+
 @_add_resolve_seedid_ph2comp_doc
 @_add_resolve_seedid_doc
-def _read_pha(filename, eventid_map=None, encoding='utf-8', **kwargs):
+def _read_pha(filename, eventid_map=None, encoding='utf-8', processes=1,
+              **kwargs):
     """
     Read a HypoDD PHA file and returns an ObsPy Catalog object.
 
@@ -112,24 +292,58 @@ def _read_pha(filename, eventid_map=None, encoding='utf-8', **kwargs):
         The returned dictionary of the HYPODDPHA writing operation can be used.
         By default, ids are not mapped.
     :param str encoding: encoding used (default: utf-8)
+    :param int processes: Number of worker processes used to create the
+        events, None for the number of CPUs (default: 1).
+        Files with fewer than 10000 events are always read in a single
+        process. Warnings from SEED id look ups are not shown for events
+        created in worker processes.
 
     :rtype: :class:`~obspy.core.event.Catalog`
     :return: An ObsPy Catalog object.
     """
+    if processes is not None and (not isinstance(processes, int) or
+                                  processes < 1):
+        msg = 'processes has to be None or a positive integer'
+        raise ValueError(msg)
     if eventid_map is not None:
         eventid_map = {v: k for k, v in eventid_map.items()}
-    with io.open(filename, 'r', encoding=encoding) as f:
-        text = f.read()
-    events = [_block2event(block, eventid_map, **kwargs)
-              for block in text.split('#')[1:]]
+    seedid_cache = {}
+    blocks = _read_blocks(filename, encoding=encoding)
+    if processes != 1:
+        # only look ahead as far as needed to decide on worker processes
+        first = list(islice(blocks, _PARALLEL_MIN_EVENTS))
+        blocks = chain(first, blocks)
+    if processes != 1 and len(first) >= _PARALLEL_MIN_EVENTS:
+        # shared arguments like an inventory are sent once per worker
+        with ProcessPoolExecutor(max_workers=processes,
+                                 initializer=_init_worker,
+                                 initargs=(eventid_map, kwargs)) as executor:
+            events = list(executor.map(_worker_block2event, blocks,
+                                       chunksize=1024))
+    else:
+        events = [_block2event(block, eventid_map, seedid_cache, **kwargs)
+                  for block in blocks]
     return Catalog(events)
 
 
-PHA1 = ('# {o.time.year} {o.time.month:>2} {o.time.day:>2} {o.time.hour:>2}'
-        ' {o.time.minute:>2} {o.time.second:>2}.{o.time.microsecond:06d}  '
-        '{o.latitude} {o.longitude} {depth}  {mag}  {he} {ve} {rms}'
-        '   {evid:>9}\n')
-PHA2 = '{p.waveform_id.station_code:6}  {relt:.4f}  {weight}  {p.phase_hint}\n'
+PHA1 = b'# %d %2d %2d %2d %2d %2d.%06d  %a %a %a  %a  %a %a %a   %9s\n'
+PHA2 = b'%-6s  %.4f  %a  %s\n'
+
+
+class _NonDigitTable(dict):
+    """
+    Translation table for str.translate deleting all non-digit characters
+
+    Entries are filled in on first use, so that the table covers all
+    unicode characters.
+    """
+    def __missing__(self, key):
+        value = key if chr(key).isdigit() else None
+        self[key] = value
+        return value
+
+
+_NONDIGIT_TABLE = _NonDigitTable()
 
 
 def _map_eventid(evid, eventid_map, used_ids, counter):
@@ -142,7 +356,7 @@ def _map_eventid(evid, eventid_map, used_ids, counter):
             raise ValueError(msg)
         return idpha
     if not idpha.isdigit():
-        idpha = ''.join(char for char in idpha if char.isdigit())
+        idpha = idpha.translate(_NONDIGIT_TABLE)
     if len(idpha) > 9:
         idpha = idpha[:9]
     while idpha == '' or idpha in used_ids:
@@ -182,7 +396,7 @@ def _write_pha(catalog, filename, eventid_map=None,
     if len(catalog) >= 10**10:
         warn('Writing a very large catalog will use event ids that might not '
              'be readable by HypoDD.')
-    lines = []
+    data = bytearray()
     if eventid_map is None:
         eventid_map = {}
     args_map_eventid = (eventid_map, set(eventid_map.values()), [1])
@@ -208,28 +422,35 @@ def _write_pha(catalog, filename, eventid_map=None,
         he1 = ori.latitude_errors.uncertainty if ori.latitude_errors else None
         he2 = (ori.longitude_errors.uncertainty if ori.longitude_errors
                else None)
-        shortening = cos(deg2rad(ori.latitude))
+        shortening = cos(radians(ori.latitude))
         he = max(0. if he1 is None else he1 * DEG2KM,
                  0. if he2 is None else he2 * DEG2KM * shortening)
         ve = ori.depth_errors.uncertainty if ori.depth_errors else None
         ve = 0. if ve is None else ve / 1000
-        line = PHA1.format(o=ori, depth=ori.depth / 1000, mag=mag,
-                           he=he, ve=ve, rms=rms,
-                           evid=evid)
-        lines.append(line)
-        weights = {str(arrival.pick_id): arrival.time_weight
-                   for arrival in ori.arrivals if arrival.time_weight}
+        t = ori.time.datetime
+        data += PHA1 % (t.year, t.month, t.day, t.hour, t.minute, t.second,
+                        t.microsecond, ori.latitude, ori.longitude,
+                        ori.depth / 1000, mag, he, ve, rms, evid.encode())
+        weights = {}
+        for arrival in ori.arrivals:
+            weight = arrival.time_weight
+            if weight:
+                weights[arrival.pick_id] = weight
+        ori_time = ori.time
         for pick in event.picks:
-            weight = weights.get(str(pick.resource_id), 1.)
-            line = PHA2.format(p=pick, relt=pick.time - ori.time,
-                               weight=weight)
-            lines.append(line)
-    data = ''.join(lines)
+            sta = pick.waveform_id.station_code
+            phase = pick.phase_hint
+            weight = weights.get(pick.resource_id, 1.)
+            data += PHA2 % (str(sta).encode(), pick.time - ori_time, weight,
+                            str(phase).encode())
     try:
-        with open(filename, 'w') as fh:
+        with open(filename, 'wb') as fh:
             fh.write(data)
     except TypeError:
-        filename.write(data)
+        try:
+            filename.write(data)
+        except TypeError:  # file-like object in text mode
+            filename.write(data.decode())
     return None if len(eventid_map) == 0 else eventid_map
 
 
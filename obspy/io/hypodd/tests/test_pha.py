@@ -1,8 +1,13 @@
 # -*- coding: utf-8 -*-
+import io
 import os
+import tempfile
 import unittest
+from unittest import mock
 import warnings
 
+import numpy as np
+
 from obspy import read_events, read_inventory, UTCDateTime
 from obspy.core.event import Catalog, Event, Origin, Pick, WaveformStreamID
 from obspy.core.util import NamedTemporaryFile
@@ -74,6 +79,90 @@ class PHATestCase(unittest.TestCase):
         self.assertEqual(len(event.origins), 1)
         self.assertEqual(len(event.magnitudes), 0)
 
+    def test_read_pha_utf16(self):
+        with open(self.fname) as f:
+            filedata = f.read()
+        with NamedTemporaryFile() as tf:
+            with open(tf.name, 'w', encoding='utf-16') as f:
+                f.write(filedata)
+            cat = read_events(tf.name, 'HYPODDPHA', encoding='utf-16')
+        cat2 = read_events(self.fname)
+        self.assertEqual(len(cat), 2)
+        for event, event2 in zip(cat, cat2):
+            self.assertEqual(event.resource_id, event2.resource_id)
+            self.assertEqual(
+                [(p.waveform_id, p.time, p.phase_hint) for p in event.picks],
+                [(p.waveform_id, p.time, p.phase_hint) for p in event2.picks])
+
+    def test_read_pha_line_endings_and_whitespace(self):
+        with open(self.fname) as f:
+            filedata = f.read()
+        cat = read_events(self.fname)
+        for data in (filedata.replace('\n', '\r'),
+                     filedata.replace('\n', '\r\n'),
+                     filedata.replace('  1.0  P', '\xa01.0\xa0P')):
+            with NamedTemporaryFile() as tf:
+                with open(tf.name, 'w', encoding='utf-8', newline='') as f:
+                    f.write(data)
+                cat2 = read_events(tf.name, 'HYPODDPHA')
+            self.assertEqual(
+                [(p.waveform_id, p.time, p.phase_hint) for p in cat[0].picks],
+                [(p.waveform_id, p.time, p.phase_hint) for p in cat2[0].picks])
+            self.assertEqual(len(cat2), 2)
+
+    def test_read_pha_malformed(self):
+        header = ('# 2025 5 14 14 35 35.51 40.2254 10.4496 9.408 3.5 '
+                  '0.0 0.0 0.0 20202331')
+        for picks in ('FUR 3.5 P\nWET 5.8 1.0 S X\n',
+                      'FUR 3.5 1.0 P\nWET 5.8 one S\n',
+                      'FUR nan 1.0 P\n', 'FUR 1e12 1.0 P\n'):
+            with NamedTemporaryFile() as tf:
+                with open(tf.name, 'w') as f:
+                    f.write(header + '\n' + picks)
+                with self.assertRaisesRegex(ValueError, '20202331'):
+                    pha._read_pha(tf.name)
+                with self.assertRaisesRegex(ValueError, '20202331'):
+                    pha._read_pha_arrays(tf.name)
+        for header in ('# 2025 5 14', header + ' 0.0'):
+            with NamedTemporaryFile() as tf:
+                with open(tf.name, 'w') as f:
+                    f.write(header + '\nFUR 3.5 1.0 P\n')
+                with self.assertRaisesRegex(ValueError, header[2:]):
+                    pha._read_pha_arrays(tf.name)
+
+    def test_read_pha_arrays(self):
+        cat = read_events(self.fname2)
+        arrays = pha._read_pha_arrays(self.fname2)
+        self.assertEqual(list(arrays['event_ids']), ['20202331', '20202429'])
+        self.assertEqual(list(arrays['event_index']), [0, 0, 1, 1])
+        self.assertEqual(list(arrays['stations']),
+                         ['FUR', 'WET', 'UBR', 'WERD'])
+        self.assertEqual(list(arrays['phases']), ['P', 'S', 'P', 'X'])
+        self.assertEqual(list(arrays['weights']), [1., 1., 1., 1.])
+        self.assertTrue(np.isnan(arrays['magnitudes'][1]))
+        self.assertEqual(list(arrays['depths']), [9.408, 9.774])
+        origin_times = [ev.origins[0].time.timestamp for ev in cat]
+        np.testing.assert_allclose(arrays['origin_times'], origin_times)
+        pick_times = [p.time.timestamp for ev in cat for p in ev.picks]
+        np.testing.assert_allclose(arrays['pick_times'], pick_times)
+
+    def test_read_pha_processes(self):
+        cat = read_events(self.fname)
+        with mock.patch.object(pha, '_PARALLEL_MIN_EVENTS', 0):
+            cat2 = pha._read_pha(self.fname, processes=2)
+        self.assertEqual(len(cat2), 2)
+        for event, event2 in zip(cat, cat2):
+            self.assertEqual(event.resource_id, event2.resource_id)
+            self.assertEqual(event.origins[0].time, event2.origins[0].time)
+            self.assertEqual(
+                [(p.waveform_id, p.time, p.phase_hint) for p in event.picks],
+                [(p.waveform_id, p.time, p.phase_hint) for p in event2.picks])
+            arr = event2.origins[0].arrivals[0]
+            self.assertIs(arr.pick_id.get_referred_object(), event2.picks[0])
+        for processes in (0, -3, 1.5):
+            with self.assertRaisesRegex(ValueError, 'positive integer'):
+                pha._read_pha(self.fname, processes=processes)
+
     def test_populate_waveform_id(self):
         inv = read_inventory()
         with warnings.catch_warnings(record=True) as ws:
@@ -132,6 +221,20 @@ class PHATestCase(unittest.TestCase):
                 filedata2 = f.read()
         self.assertEqual(filedata2.replace(' ', ''), filedata.replace(' ', ''))
 
+    def test_write_pha_file_like(self):
+        cat = read_events(self.fname)
+        bio = io.BytesIO()
+        sio = io.StringIO()
+        cat.write(bio, 'HYPODDPHA')
+        cat.write(sio, 'HYPODDPHA')
+        self.assertEqual(bio.getvalue().decode(), sio.getvalue())
+        self.assertTrue(sio.getvalue().startswith('# 2025  5 14 14 35 35.51'))
+        # text mode wrapper not derived from io.TextIOBase
+        with tempfile.NamedTemporaryFile('w+') as tf:
+            cat.write(tf, 'HYPODDPHA')
+            tf.seek(0)
+            self.assertEqual(tf.read(), sio.getvalue())
+
     def test_write_pha_minimal(self):
         ori = Origin(time=UTCDateTime(0), latitude=42, longitude=43,
                      depth=10000)